@@ -1,6 +1,36 @@
+import numpy as np
+import pandas as pd
 import plotly.graph_objs as go
 from plotly import subplots
 
+# plotly-resampler is optional: when available, figures are wrapped so that only the points
+# needed for the current viewport are sent to the browser.  Without it, long horizons
+# (e.g. a year of minute data) ship every point and make the figures sluggish.
+try:
+    from plotly_resampler import FigureResampler
+except ImportError:
+    FigureResampler = None
+
+
+def _downsampled(fig):
+    """ Wrap a figure with plotly-resampler when it is installed, otherwise return it unchanged """
+    if FigureResampler is None:
+        return fig
+    return FigureResampler(fig)
+
+
+def _scatter(x, y, **kwargs):
+    """
+    Build a go.Scatter while avoiding slow per-element Python boxing.
+    Passing raw numpy arrays (instead of Series.tolist() / DatetimeIndex) lets plotly serialise
+    the data at C speed, which matters for long time-series.
+    """
+    if hasattr(x, 'values'):
+        x = x.values
+    if hasattr(y, 'to_numpy'):
+        y = y.to_numpy()
+    return go.Scatter(x=x, y=y, **kwargs)
+
 
 def generate_scenario_fig(df, time_from=None, time_to=None):
     if time_from is None:
@@ -10,20 +40,20 @@ def generate_scenario_fig(df, time_from=None, time_to=None):
 
     df_slice = df.loc[time_from:time_to, :]
 
-    trace_gen = go.Scatter(x=df_slice.index,
-                           y=df_slice['generation'].tolist(),
+    trace_gen = _scatter(x=df_slice.index,
+                           y=df_slice['generation'],
                            name="generation",
                            line=dict(color='green', width=2))
-    trace_dem = go.Scatter(x=df_slice.index,
-                           y=df_slice['demand'].tolist(),
+    trace_dem = _scatter(x=df_slice.index,
+                           y=df_slice['demand'],
                            name="demand",
                            line=dict(color='red', width=2, dash='dot'))
-    trace_ti = go.Scatter(x=df_slice.index,
-                          y=df_slice['tariff_import'].tolist(),
+    trace_ti = _scatter(x=df_slice.index,
+                          y=df_slice['tariff_import'],
                           name="tariff - import",
                           line=dict(color='magenta', width=2))
-    trace_te = go.Scatter(x=df_slice.index,
-                          y=df_slice['tariff_export'].tolist(),
+    trace_te = _scatter(x=df_slice.index,
+                          y=df_slice['tariff_export'],
                           name="tariff - export",
                           line=dict(color='orange', width=2))
 
@@ -52,7 +82,7 @@ def generate_scenario_fig(df, time_from=None, time_to=None):
         ),
     )
 
-    return fig
+    return _downsampled(fig)
 
 
 def generate_solution_fig(
@@ -69,109 +99,83 @@ def generate_solution_fig(
     df_slice = df.loc[time_from:time_to, :]
     solution_slice = solution.loc[time_from:time_to, :]
 
-    # Determine total number of subfigs.  There are probably cleaner ways to do this :)
-    num_subfigs = len(include_subfigs)
-    for subfig in exclude_subfigs:
-        if subfig in include_subfigs:
-            num_subfigs = num_subfigs - 1
+    # Extract underlying arrays once, rather than re-indexing the dataframes in every branch below
+    df_index = df_slice.index.values
+    generation = df_slice['generation'].to_numpy()
+    demand = df_slice['demand'].to_numpy()
+    tariff_import = df_slice['tariff_import'].to_numpy()
+    tariff_export = df_slice['tariff_export'].to_numpy()
+    solution_index = solution_slice.index.values
+    charge_rate_actual = solution_slice['charge_rate_actual'].to_numpy()
+    soc_actual = solution_slice['soc_actual'].to_numpy()
+    solar_curtailment = solution_slice['solar_curtailment'].to_numpy()
+    grid_impact = solution_slice['grid_impact'].to_numpy()
+    accumulated_cost = solution_slice['accumulated_cost'].to_numpy()
+
+    # Determine which subfigs are active, and how many there are in total
+    active_subfigs = frozenset(include_subfigs).difference(exclude_subfigs)
+    num_subfigs = len(active_subfigs)
     curr_subfig_num = 1
 
     fig = subplots.make_subplots(rows=num_subfigs, cols=1, shared_xaxes=True, print_grid=False,
                                  vertical_spacing=0.05,
                                  subplot_titles=[" "]*num_subfigs)
 
-    if 'gendem' in include_subfigs and 'gendem' not in exclude_subfigs:
-        trace_gen = go.Scatter(x=df_slice.index,
-                               y=df_slice['generation'].tolist(),
-                               name="generation",
-                               line=dict(width=2))
-        trace_dem = go.Scatter(x=df_slice.index,
-                               y=df_slice['demand'].tolist(),
-                               name="demand",
-                               line=dict(width=2, dash='dot'))
-        fig.append_trace(trace_gen, curr_subfig_num, 1)
-        fig.append_trace(trace_dem, curr_subfig_num, 1)
-        fig.update_yaxes(title_text="W", row=curr_subfig_num, col=1)
-        fig.layout.annotations[curr_subfig_num-1].update(text="Demand and generation")
-        curr_subfig_num = curr_subfig_num + 1
-
-    if 'tariffs' in include_subfigs and 'tariffs' not in exclude_subfigs:
-        trace_ti = go.Scatter(x=df_slice.index,
-                              y=df_slice['tariff_import'].tolist(),
-                              name="tariff - import",
-                              line=dict(width=2))
-        trace_te = go.Scatter(x=df_slice.index,
-                              y=df_slice['tariff_export'].tolist(),
-                              name="tariff - export",
-                              line=dict(width=2))
-        fig.append_trace(trace_ti, curr_subfig_num, 1)
-        fig.append_trace(trace_te, curr_subfig_num, 1)
-        fig.update_yaxes(title_text="$/kWh", row=curr_subfig_num, col=1)
-        fig.layout.annotations[curr_subfig_num-1].update(text="Tariffs")
-        curr_subfig_num = curr_subfig_num + 1
-
-    if 'charge_rate' in include_subfigs and 'charge_rate' not in exclude_subfigs:
-        trace_cr = go.Scatter(x=solution_slice.index,
-                              y=solution_slice['charge_rate_actual'],
-                              name='charge rate',
-                              line=dict(width=2),
-                              showlegend=False)
-        fig.append_trace(trace_cr, curr_subfig_num, 1)
-        fig.update_yaxes(title_text="W", row=curr_subfig_num, col=1)
-        fig.layout.annotations[curr_subfig_num-1].update(text="Charge rate")
-        curr_subfig_num = curr_subfig_num + 1
-
-    if 'solar_curtailment' in include_subfigs and 'solar_curtailment' not in exclude_subfigs:
-        trace_sc = go.Scatter(x=solution_slice.index,
-                              y=solution_slice['solar_curtailment'],
-                              name='solar curtailment',
-                              showlegend=False)
-        fig.append_trace(trace_sc, curr_subfig_num, 1)
-        fig.update_yaxes(title_text="W", row=curr_subfig_num, col=1)
-        fig.layout.annotations[curr_subfig_num-1].update(text="Solar curtailment")
-        curr_subfig_num = curr_subfig_num + 1
-
-    if 'net_impact' in include_subfigs and 'net_impact' not in exclude_subfigs:
-        trace_gi = go.Scatter(x=solution_slice.index,
-                              y=solution_slice['grid_impact'],
-                              name='net grid impact',
-                              showlegend=False)
-        fig.append_trace(trace_gi, curr_subfig_num, 1)
-        fig.update_yaxes(title_text="W", row=curr_subfig_num, col=1)
-        fig.layout.annotations[curr_subfig_num-1].update(text="Net grid impact")
-        curr_subfig_num = curr_subfig_num + 1
-
-    if 'soc' in include_subfigs and 'soc' not in exclude_subfigs:
-        trace_soc = go.Scatter(x=solution_slice.index,
-                               y=solution_slice['soc_actual'],
-                               name='soc',
-                               showlegend=False)
-        fig.append_trace(trace_soc, curr_subfig_num, 1)
-        fig.update_yaxes(title_text="%", range=[0, 100], row=curr_subfig_num, col=1)
-        fig.layout.annotations[curr_subfig_num-1].update(text="State of charge")
-        curr_subfig_num = curr_subfig_num + 1
-
-    # Revenue and cost are inverse of one another
-    if 'cost' in include_subfigs and 'cost' not in exclude_subfigs:
-        trace_cost = go.Scatter(x=solution_slice.index,
-                                y=solution_slice['accumulated_cost'],
-                                name='cost',
-                                showlegend=False)
-        fig.append_trace(trace_cost, curr_subfig_num, 1)
-        fig.update_yaxes(title_text="$", row=curr_subfig_num, col=1)
-        fig.layout.annotations[curr_subfig_num-1].update(text="Cost")
-        curr_subfig_num = curr_subfig_num + 1
-    if 'revenue' in include_subfigs and 'revenue' not in exclude_subfigs:
-        trace_revenue = go.Scatter(x=solution_slice.index,
-                                   y=-1 * solution_slice['accumulated_cost'],
-                                   name='revenue',
-                                   showlegend=False)
-        fig.append_trace(trace_revenue, curr_subfig_num, 1)
-        fig.update_yaxes(title_text="$", row=curr_subfig_num, col=1)
-        fig.layout.annotations[curr_subfig_num-1].update(text="Revenue")
+    # Subfig construction is driven by this table (name, title, yaxis settings, trace factory)
+    # rather than a cascade of membership branches; the order here fixes the subfig order.
+    # Note that revenue and cost are inverse of one another.
+    subfig_specs = [
+        ('gendem', "Demand and generation", dict(title=dict(text="W")),
+         lambda: [_scatter(x=df_index, y=generation, name="generation",
+                           line=dict(width=2)),
+                  _scatter(x=df_index, y=demand, name="demand",
+                           line=dict(width=2, dash='dot'))]),
+        ('tariffs', "Tariffs", dict(title=dict(text="$/kWh")),
+         lambda: [_scatter(x=df_index, y=tariff_import, name="tariff - import",
+                           line=dict(width=2)),
+                  _scatter(x=df_index, y=tariff_export, name="tariff - export",
+                           line=dict(width=2))]),
+        ('charge_rate', "Charge rate", dict(title=dict(text="W")),
+         lambda: [_scatter(x=solution_index, y=charge_rate_actual, name='charge rate',
+                           line=dict(width=2), showlegend=False)]),
+        ('solar_curtailment', "Solar curtailment", dict(title=dict(text="W")),
+         lambda: [_scatter(x=solution_index, y=solar_curtailment, name='solar curtailment',
+                           showlegend=False)]),
+        ('net_impact', "Net grid impact", dict(title=dict(text="W")),
+         lambda: [_scatter(x=solution_index, y=grid_impact, name='net grid impact',
+                           showlegend=False)]),
+        ('soc', "State of charge", dict(title=dict(text="%"), range=[0, 100]),
+         lambda: [_scatter(x=solution_index, y=soc_actual, name='soc',
+                           showlegend=False)]),
+        ('cost', "Cost", dict(title=dict(text="$")),
+         lambda: [_scatter(x=solution_index, y=accumulated_cost, name='cost',
+                           showlegend=False)]),
+        ('revenue', "Revenue", dict(title=dict(text="$")),
+         lambda: [_scatter(x=solution_index, y=np.negative(accumulated_cost), name='revenue',
+                           showlegend=False)]),
+    ]
+
+    # Accumulate per-subfig axis settings and titles, applied in a single layout update at the
+    # end -- every update_yaxes / annotation update re-validates the whole layout in plotly
+    yaxis_settings = []
+    subfig_titles = []
+
+    for name, title, yaxis, make_traces in subfig_specs:
+        if name not in active_subfigs:
+            continue
+        for trace in make_traces():
+            fig.append_trace(trace, curr_subfig_num, 1)
+        yaxis_settings.append(yaxis)
+        subfig_titles.append(title)
         curr_subfig_num = curr_subfig_num + 1
 
-    fig['layout'].update(
+    # Apply all axis titles and annotations in one layout update
+    layout_updates = {f"yaxis{i + 1}": settings for i, settings in enumerate(yaxis_settings)}
+    layout_updates["annotations"] = [
+        dict(annotation.to_plotly_json(), text=title)
+        for annotation, title in zip(fig.layout.annotations, subfig_titles)
+    ]
+    fig.update_layout(
         height=120 * num_subfigs,
         margin=go.layout.Margin(
             l=50,
@@ -180,9 +184,10 @@ def generate_solution_fig(
             t=30,
             pad=0
         ),
+        **layout_updates,
     )
 
-    return fig
+    return _downsampled(fig)
 
 
 def generate_evaluation_fig(evaluation, show_as_revenue=False):
@@ -191,13 +196,14 @@ def generate_evaluation_fig(evaluation, show_as_revenue=False):
     Default is to show cost.  When show_as_revenue=True, instead shows as revenue (inverse of cost)
     """
     traces = []
+    evaluation_index = evaluation.index.values
     for eval in evaluation:
+        # Negate the raw ndarray rather than the Series -- avoids a Series allocation per column
+        y_vals = evaluation[eval].to_numpy()
         if show_as_revenue:
-            y_vals = -1 * evaluation[eval]
-        else:
-            y_vals = evaluation[eval]
-        trace = go.Scatter(
-            x=evaluation.index,
+            y_vals = np.negative(y_vals)
+        trace = _scatter(
+            x=evaluation_index,
             y=y_vals,
             mode='lines',
             name=eval,
@@ -220,7 +226,7 @@ def generate_evaluation_fig(evaluation, show_as_revenue=False):
         ),
         yaxis = yaxis,
     )
-    return go.Figure(data=traces, layout=layout)
+    return _downsampled(go.Figure(data=traces, layout=layout))
 
 
 def generate_schedule_charge_rate_fig(scheduler):
@@ -229,14 +235,14 @@ def generate_schedule_charge_rate_fig(scheduler):
     for controller in scheduler.charge_rates_all:
         if controller == 'DN':
             continue
-        trace = go.Scatter(
+        trace = _scatter(
             x=scheduler.charge_rates_all.index,
             y=scheduler.charge_rates_all[controller],
             mode='lines',
             name=controller,
         )
         traces.append(trace)
-    traces.append(go.Scatter(
+    traces.append(_scatter(
         x=scheduler.solution_optimal.index,
         y=scheduler.solution_optimal['charge_rate'],
         mode='lines',
@@ -261,15 +267,19 @@ def generate_schedule_near_optimal_fig(schedule_near_optimal):
     traces = []
     names = []
 
+    # Work on the underlying 2-D array -- avoids a boolean-indexed DataFrame allocation per column
+    values = schedule_near_optimal.to_numpy()
+    index = schedule_near_optimal.index.values
+
     controller_index = len(schedule_near_optimal.columns) - 1
-    for controller in schedule_near_optimal:
+    for col, controller in enumerate(schedule_near_optimal.columns):
         if controller == 'DN':
             continue
         # Keep only ones, ditch zeros
-        df = schedule_near_optimal[schedule_near_optimal[controller] == 1]
-        trace = go.Scatter(
-            x=df.index,
-            y=[y * controller_index for y in df[controller]],
+        mask = values[:, col] == 1
+        trace = _scatter(
+            x=index[mask],
+            y=np.full(int(mask.sum()), controller_index),
             mode='markers',
             name=controller,
             showlegend=False
@@ -298,17 +308,15 @@ def generate_schedule_near_optimal_fig(schedule_near_optimal):
 
 
 def generate_schedule_fig(schedule):
-    controllers = {}
-    for ts, c_name in schedule.items():
-        if c_name not in controllers.keys():
-            controllers[c_name] = []
-        controllers[c_name].append(ts)
+    # Group timestamps by controller in a single vectorised pass, rather than
+    # building up a dict of lists one interval at a time
+    schedule_series = pd.Series(schedule)
 
     traces = []
-    for c_name, timestamps in controllers.items():
+    for c_name, timestamps in schedule_series.groupby(schedule_series).groups.items():
         traces.append(go.Scatter(
-            x=timestamps,
-            y=[1] * len(timestamps),
+            x=timestamps.values,
+            y=np.ones(len(timestamps), dtype=np.int8),
             mode='markers',
             name=c_name,
         ))
@@ -38,3 +38,12 @@ class SimulatedBattery(AbstractBattery):
 
     def get_current_soc(self) -> float:
         return self.last_soc
+
+    def validate_soc(self) -> bool:
+        """
+        Check that the current SOC is within the min and max SOC.
+        For a simulated battery the current SOC is just last_soc, so read it directly rather than
+        dispatching through get_current_soc() -- this runs once per timestep in simulation loops.
+        :return: True if the current SOC is within the min and max SOC, False otherwise.
+        """
+        return self.model.min_soc <= self.last_soc <= self.model.max_soc
@@ -1,18 +1,70 @@
 from typing import Optional
 
+import numpy as np
+
+from oes.util.jit import njit
+
+
+@njit(cache=True)
+def compute_degradation_cost(change_soc_wh: float, cost_per_wh_charge: float, cost_per_wh_discharge: float) -> float:
+    """
+    Free-function version of the degradation cost calculation.  Taking the parameters as plain
+    scalars keeps this callable from compiled (numba) loops without any object-attribute access.
+    Takes per-Wh costs (cost per kWh / 1000), so the conversion happens once per model update
+    rather than once per call.
+    :param change_soc_wh: change in state of charge, in Wh (positive when charging)
+    :param cost_per_wh_charge: degradation cost per Wh of charge, in $
+    :param cost_per_wh_discharge: degradation cost per Wh of discharge, in $
+    :return: degradation cost of this change in state of charge, in $
+    """
+    # Branchless select: the charge/discharge sign alternates unpredictably across DP-grid
+    # cells, and np.where also lets callers pass a whole array of SOC changes at once
+    cost_per_wh = np.where(change_soc_wh > 0, cost_per_wh_charge, cost_per_wh_discharge)
+    return np.abs(change_soc_wh * cost_per_wh)
+
+
+@njit(cache=True)
+def determine_impact_charge_rate_efficiency(charge_rate: float, inv_eff_factor_charging: float,
+                                            eff_factor_discharging: float) -> float:
+    """
+    Free-function version of the charge rate efficiency calculation, usable from compiled loops.
+    Takes the inverse charging factor (100 / efficiency) and discharging factor (efficiency / 100),
+    so both sides of the select are a single multiply and the conversion is done once per model
+    update instead of once per call.
+    :param charge_rate: desired battery charge rate, in W
+    :param inv_eff_factor_charging: inverse efficiency factor of charging (>= 1)
+    :param eff_factor_discharging: efficiency factor of discharging (0-1]
+    :return: the impact of the battery resulting from this change in SOC, in W
+    """
+    # np.where keeps this branchless and lets callers pass a whole array of charge rates at once
+    return charge_rate * np.where(charge_rate > 0,
+                                  inv_eff_factor_charging,  # charging
+                                  eff_factor_discharging)  # discharging
+
+
+@njit(cache=True)
+def compute_soc_change_wh(soc_change_percent: float, capacity: float) -> float:
+    """ Free-function version of the SOC percentage to capacity Wh conversion """
+    return soc_change_percent / 100.0 * capacity
+
+
+# Built once at import time -- get_default_battery_params hands out copies, so repeated model
+# construction (e.g. parameter sweeps) doesn't rebuild this dict from literals every time
+_DEFAULT_BATTERY_PARAMS = {
+    "capacity": 13500.0,  # battery capacity, in Wh
+    "max_charge_rate": 7000.0,  # peak charge rate, in W
+    "max_discharge_rate": 7000.0,  # peak discharge rate, in W
+    "max_soc": 94.0,  # max soc we can charge to, in %
+    "min_soc": 20.0,  # min soc we can discharge to, in %
+    "degradation_cost_per_kwh_charge": 0.0,  # degradation cost per kWh of charge, in $
+    "degradation_cost_per_kwh_discharge": 0.0,  # degradation cost per kWh of discharge, in $
+    "efficiency_charging": 100.0,  # efficiency of charging, in %
+    "efficiency_discharging": 100.0,  # efficiency of discharging, in %
+}
+
 
 def get_default_battery_params() -> dict:
-    return {
-        "capacity": 13500.0,  # battery capacity, in Wh
-        "max_charge_rate": 7000.0,  # peak charge rate, in W
-        "max_discharge_rate": 7000.0,  # peak discharge rate, in W
-        "max_soc": 94.0,  # max soc we can charge to, in %
-        "min_soc": 20.0,  # min soc we can discharge to, in %
-        "degradation_cost_per_kwh_charge": 0.0,  # degradation cost per kWh of charge, in $
-        "degradation_cost_per_kwh_discharge": 0.0,  # degradation cost per kWh of discharge, in $
-        "efficiency_charging": 100.0,  # efficiency of charging, in %
-        "efficiency_discharging": 100.0,  # efficiency of discharging, in %
-    }
+    return dict(_DEFAULT_BATTERY_PARAMS)
 
 
 class BatteryModel:
@@ -20,6 +72,30 @@ class BatteryModel:
     Simple battery model to keep track of battery parameters and battery state of charge.
     """
 
+    # Declaring slots makes parameter reads fixed-offset attribute loads -- these are read once
+    # per interval (or per DP-grid cell) in controller hot loops, where dict lookups add up.
+    __slots__ = (
+        "capacity",
+        "max_charge_rate",
+        "max_discharge_rate",
+        "max_soc",
+        "min_soc",
+        "degradation_cost_per_kwh_charge",
+        "degradation_cost_per_kwh_discharge",
+        "efficiency_charging",
+        "efficiency_discharging",
+        # Cached factors derived whenever params are validated: the inverse charging factor
+        # (100 / efficiency), discharging factor (efficiency / 100), and degradation costs
+        # per Wh (cost per kWh / 1000)
+        "_inv_eff_factor_charging",
+        "_eff_factor_discharging",
+        "_deg_cost_per_wh_charge",
+        "_deg_cost_per_wh_discharge",
+    )
+
+    # Keys that may be set through update_params (the public slots)
+    _PARAM_KEYS = frozenset(key for key in __slots__ if not key.startswith("_"))
+
     def __init__(self, params: dict = {}) -> None:
         """
         Initialise battery model.  For some parameters, default values are set if they are not passed in.
@@ -41,25 +117,32 @@ class BatteryModel:
         # Update the above with input params, which also validates the params
         self.update_params(params)
 
-    def update_params(self, params: dict) -> None:
+    def update_params(self, params: dict, validate: bool = True) -> None:
         """
         Update battery parameters
         :param params: dictionary of <parameter_name>, <parameter_value> pairs
+        :param validate: whether to validate parameters after updating.  Callers that repeatedly
+                         tweak an already-valid model (e.g. MPC inner loops) can pass False and
+                         call validate_params() themselves once at the end; the cached derived
+                         factors are refreshed as part of validation.
         :return: None
         """
         for key, value in params.items():
-            if hasattr(self, key):
+            if key in self._PARAM_KEYS:
                 setattr(self, key, value)
-        self.validate_params()
+
+        if validate:
+            self.validate_params()
 
     def validate_params(self) -> None:
         """
         Check that all parameters have values (none are None), and perform some sanity checks on value ranges
         """
 
-        # Check for missing attributes
+        # Check for missing attributes (only the public parameters; the private cached factors
+        # are always derived in update_params)
         missing_attributes = []
-        for attrib in self.__dict__.keys():
+        for attrib in self._PARAM_KEYS:
             if getattr(self, attrib) is None:
                 missing_attributes.append(attrib)
         if len(missing_attributes) > 0:
@@ -86,6 +169,14 @@ class BatteryModel:
             raise AttributeError("efficiency_charging must be a positive value between 0 and 100")
         if (self.efficiency_discharging > 100.0) | (self.efficiency_discharging <= 0.0):
             raise AttributeError("efficiency_discharging must be a positive value between 0 and 100")
+
+        # Cache derived factors once the params are known to be valid, so hot paths avoid
+        # recomputing them per call (deriving them earlier would turn an invalid parameter into
+        # a raw arithmetic error instead of the messages above)
+        self._inv_eff_factor_charging = 100 / self.efficiency_charging
+        self._eff_factor_discharging = self.efficiency_discharging / 100
+        self._deg_cost_per_wh_charge = self.degradation_cost_per_kwh_charge / 1000
+        self._deg_cost_per_wh_discharge = self.degradation_cost_per_kwh_discharge / 1000
         return
 
     def to_json(self) -> dict:
@@ -107,10 +198,8 @@ class BatteryModel:
 
     def compute_degradation_cost(self, change_soc_in_wh: float) -> float:
         """ Calculate the degradation cost of a change in state of charge """
-        if change_soc_in_wh > 0:  # charging
-            return abs(change_soc_in_wh * self.degradation_cost_per_kwh_charge / 1000)
-        else:  # discharging
-            return abs(change_soc_in_wh * self.degradation_cost_per_kwh_discharge / 1000)
+        return compute_degradation_cost(change_soc_in_wh, self._deg_cost_per_wh_charge,
+                                        self._deg_cost_per_wh_discharge)
 
     def determine_impact_charge_rate_efficiency(self, charge_rate: float) -> float:
         """
@@ -119,13 +208,11 @@ class BatteryModel:
         :param charge_rate: desired battery charge rate, in W
         :return: the impact of the battery resulting from this change in SOC, in W (float)
         """
-        if charge_rate > 0:  # charging
-            return charge_rate / (self.efficiency_charging / 100)
-        else:  # discharging
-            return charge_rate * (self.efficiency_discharging / 100)
+        return determine_impact_charge_rate_efficiency(charge_rate, self._inv_eff_factor_charging,
+                                                       self._eff_factor_discharging)
 
     def compute_soc_change_wh(self, soc_change_percent: float) -> float:
         """
         Convert change in SOC percentage to a change in capacity Wh
         """
-        return soc_change_percent / 100.0 * self.capacity
+        return compute_soc_change_wh(soc_change_percent, self.capacity)
@@ -1,16 +1,106 @@
+import os
 from abc import ABC
+import numpy as np
 import pandas as pd
-import copy
 import warnings
 from typing import Optional
 from oes.battery.battery import AbstractBattery
 from oes.util.general import get_feasible_charge_rate
-from oes.util.conversions import charge_rate_to_change_in_soc, resolution_in_hours
+from oes.util.conversions import resolution_in_hours
+from oes.util.jit import njit, prange
+
+
+@njit(cache=True)
+def _simulate_soc(charge_rates: np.ndarray, rate_to_soc: float, min_soc: float, max_soc: float,
+                  max_charge_rate: float, max_discharge_rate: float, initial_soc: float):
+    """
+    Simulate the SOC trajectory for an array of requested charge rates, clamping each interval's
+    rate to what the battery limits and the SOC reached so far allow.  Operates on plain scalars
+    and arrays only, so numba can compile it when available.
+    :param charge_rates: requested charge rate in W for every interval (first entry must be 0)
+    :param rate_to_soc: factor converting a charge rate in W to a change in soc (%) per interval
+    :param min_soc: min soc we can discharge to, in %
+    :param max_soc: max soc we can charge to, in %
+    :param max_charge_rate: peak charge rate, in W
+    :param max_discharge_rate: peak discharge rate, in W
+    :param initial_soc: battery state of charge at the first interval, in %
+    :return: (feasible charge rates in W, resulting soc in %) as two arrays
+    """
+    num_intervals = len(charge_rates)
+    feasible_rates = np.empty(num_intervals, dtype=np.float64)
+    all_soc = np.empty(num_intervals, dtype=np.float64)
+    soc = initial_soc
+    feasible_rates[0] = 0.0
+    all_soc[0] = soc
+    for i in range(1, num_intervals):
+        rate = charge_rates[i]
+        if rate >= 0:
+            rate = min(rate, max_charge_rate, (max_soc - soc) / rate_to_soc)
+        else:
+            rate = -1 * min(-1 * rate, max_discharge_rate, (soc - min_soc) / rate_to_soc)
+        soc = soc + rate * rate_to_soc
+        feasible_rates[i] = rate
+        all_soc[i] = soc
+    return feasible_rates, all_soc
+
+
+@njit(cache=True, parallel=True)
+def _simulate_soc_batch(charge_rates: np.ndarray, rate_to_soc: np.ndarray, min_soc: np.ndarray,
+                        max_soc: np.ndarray, max_charge_rate: np.ndarray, max_discharge_rate: np.ndarray,
+                        initial_soc: np.ndarray) -> np.ndarray:
+    """
+    Batch version of _simulate_soc: simulate K independent SOC trajectories at once.
+    The per-interval recurrence is sequential in time, so the loop over intervals stays, but the
+    K trajectories are independent of each other and are spread across threads via prange when
+    numba is available (plain range otherwise).
+    :param charge_rates: requested charge rates in W, shape (K, N)
+    :param rate_to_soc: per-trajectory factor converting W to change in soc (%) per interval, shape (K,)
+    :param min_soc: per-trajectory min soc, in %, shape (K,)
+    :param max_soc: per-trajectory max soc, in %, shape (K,)
+    :param max_charge_rate: per-trajectory peak charge rate, in W, shape (K,)
+    :param max_discharge_rate: per-trajectory peak discharge rate, in W, shape (K,)
+    :param initial_soc: per-trajectory starting soc, in %, shape (K,)
+    :return: array of shape (K, N, 2) with feasible charge rate in [..., 0] and soc in [..., 1]
+    """
+    num_trajectories, num_intervals = charge_rates.shape
+    out = np.empty((num_trajectories, num_intervals, 2), dtype=np.float64)
+    for k in prange(num_trajectories):
+        feasible_rates, all_soc = _simulate_soc(charge_rates[k], rate_to_soc[k], min_soc[k], max_soc[k],
+                                                max_charge_rate[k], max_discharge_rate[k], initial_soc[k])
+        out[k, :, 0] = feasible_rates
+        out[k, :, 1] = all_soc
+    return out
+
+
+# Optionally warm up the compiled kernels at import, so the first solve() call doesn't pay the
+# JIT compile (with cache=True, later runs only pay the much cheaper cache load).  Opt-in via
+# environment variable, since import-time compilation is unwelcome in short-lived processes.
+if os.environ.get("OES_NUMBA_WARMUP") == "1":
+    try:
+        _simulate_soc(np.zeros(2), 1.0, 0.0, 100.0, 1.0, 1.0, 50.0)
+        _simulate_soc_batch(np.zeros((1, 2)), np.ones(1), np.zeros(1), np.full(1, 100.0),
+                            np.ones(1), np.ones(1), np.full(1, 50.0))
+    except Exception:  # pragma: no cover - warmup is best-effort only
+        pass
 
 
 class AbstractBatteryController(ABC):
     """ Base class for any battery controller """
 
+    # Declaring slots keeps instances dict-free, which matters when ensembles instantiate
+    # thousands of controllers: attribute reads become fixed-offset loads and per-instance
+    # memory drops.  Subclasses declare their own additional attributes the same way.
+    __slots__ = (
+        "name",
+        "debug",
+        "battery",
+        "solution",
+        "constrain_charge_rate",
+        "interval_size_in_hours",
+        "fixed_interval_size_in_hours",
+        "solution_dtype",
+    )
+
     def __init__(self, name: str = "AbstractBatteryController", params: dict = {}, debug: bool = False):
         self.name = name
         self.debug = debug
@@ -29,6 +119,15 @@ class AbstractBatteryController(ABC):
         # is passed in self.solve(scenario, battery)
         self.interval_size_in_hours = None
 
+        # When the resolution is known up front (e.g. repeated solves on a fixed schedule), it can
+        # be set via params to skip per-solve detection from the scenario index
+        self.fixed_interval_size_in_hours = None
+
+        # Dtype of the solution charge_rate / soc arrays.  Battery percentages and watts only
+        # need ~0.01% precision, so ensemble runs that accumulate many solutions in memory can
+        # set this to np.float32 via params to halve the footprint; default keeps full precision.
+        self.solution_dtype = np.float64
+
     def update_params(self, params: dict) -> None:
         """
         Update parameters -- overrides any defaults set in __init__
@@ -45,15 +144,29 @@ class AbstractBatteryController(ABC):
             else:
                 warnings.warn(f"{self.__class__.__name__} does not have an attribute {key}")
 
-    def solve_one_interval(self, scenario_interval: pd.DataFrame) -> float:
+    def solve_one_interval(self, scenario_interval: tuple) -> float:
         """
         Solve a single interval: determine charge rate chosen by this controller in this interval.
         This function determines controller functionality and will be implemented differently in all child instances
-        :param scenario_interval: pd.DataFrame having only a single row (one interval in scenario)
+        :param scenario_interval: named tuple with one attribute per scenario column (e.g.
+                                  scenario_interval.generation); a pd.Series row works equally,
+                                  since it also supports attribute access by column name
         :return: charge rate for this interval
         """
         pass
 
+    def compute_charge_rates(self, scenario: pd.DataFrame) -> Optional[np.ndarray]:
+        """
+        Determine the charge rates this controller would choose for every interval in the scenario,
+        ignoring battery state (SOC constraints are applied afterwards by solve).
+        Controllers whose choice of charge rate does not depend on the evolving battery SOC should
+        override this to return an array of length len(scenario); solve then avoids the per-interval
+        Python loop entirely.  Returning None (the default) falls back to the interval-by-interval path.
+        :param scenario: scenario dataframe, see solve for details
+        :return: array of charge rates in W (one per interval), or None
+        """
+        return None
+
     def solve(self, scenario: pd.DataFrame, battery: Optional[AbstractBattery] = None) -> pd.DataFrame:
         """
         Determine charge / discharge rates and resulting battery soc for every interval in the horizon
@@ -66,41 +179,226 @@ class AbstractBatteryController(ABC):
                     - 'charge_rate': float indicating charging rate for this interval in W
                     - 'soc': float indicating resulting state of charge in %
         """
+        _, charge_rates, all_soc = self.solve_arrays(scenario, battery)
 
-        # Keep local copy of battery model (avoid changing original battery object)
-        self.battery = copy.copy(battery)
+        # Store solution locally.  Constructing with the scenario index directly avoids the
+        # set_index round-trip, which copies the column buffers.
+        self.solution = pd.DataFrame(data={
+            "charge_rate": charge_rates,
+            "soc": all_soc
+        }, index=scenario.index, copy=False)
+
+        return self.solution
+
+    def solve_arrays(self, scenario: pd.DataFrame, battery: Optional[AbstractBattery] = None) -> tuple:
+        """
+        Array-level version of solve, for callers (schedulers, optimisers, ensembles) that work
+        on the raw trajectories and don't need a DataFrame: skips the frame construction, which
+        costs more than the simulation itself for the simple controllers.  solve() is a thin
+        wrapper around this.
+        :param scenario: scenario dataframe, see solve for details
+        :param battery: battery instance
+        :return: (timestamps, charge rates in W, soc in %) as three numpy arrays
+        """
 
-        # Store interval size in hours locally - required for later computations
-        self.interval_size_in_hours = resolution_in_hours(scenario)
+        # Store battery reference.  No copy is needed: solve tracks the running SOC in locals and
+        # never writes to the battery object, and copying per call adds up in MPC-style rollouts.
+        self.battery = battery
 
-        # Keep track of relevant values
-        all_soc = [self.battery.get_current_soc()]
-        all_charge_rates = [0.0]
+        # Store interval size in hours locally - required for later computations.  Detection is
+        # skipped when the resolution has been fixed via params.
+        if self.fixed_interval_size_in_hours is not None:
+            self.interval_size_in_hours = self.fixed_interval_size_in_hours
+        else:
+            self.interval_size_in_hours = resolution_in_hours(scenario)
 
-        # Iterate from 2nd row onwards
-        for index, row in scenario.iloc[1:].iterrows():
+        # Fast path: controllers that can state their charge rates up front (independent of the
+        # evolving SOC) are solved in one pass over numpy arrays instead of row by row
+        charge_rates = self.compute_charge_rates(scenario)
+        if charge_rates is not None:
+            return self._solve_arrays_from_charge_rates(scenario, charge_rates)
 
-            charge_rate = self.solve_one_interval(row)
+        # Keep track of relevant values in preallocated arrays -- appending to lists and
+        # converting at the end costs an extra pass over boxed Python floats
+        num_intervals = len(scenario.index)
+        all_soc = np.empty(num_intervals, dtype=self.solution_dtype)
+        all_charge_rates = np.empty(num_intervals, dtype=self.solution_dtype)
+        all_soc[0] = soc = self.battery.get_current_soc()
+        all_charge_rates[0] = 0.0
+
+        # Hoist attribute lookups that are invariant across the loop into locals, and precompute
+        # the W-to-soc-change factor so the soc update is a single multiply (no function call)
+        model = self.battery.model
+        interval_size_in_hours = self.interval_size_in_hours
+        soc_per_watt = 100.0 * interval_size_in_hours / model.capacity
+        constrain_charge_rate = self.constrain_charge_rate
+        solve_one_interval = self.solve_one_interval
+
+        # Iterate from 2nd row onwards.  itertuples avoids materialising a pd.Series per row,
+        # which dominates the cost of this loop on long scenarios.
+        i = 1
+        for row in scenario.iloc[1:].itertuples(index=False, name="ScenarioInterval"):
+
+            charge_rate = solve_one_interval(row)
 
             # Ensure charge rate is feasible
-            if self.constrain_charge_rate:
-                charge_rate = get_feasible_charge_rate(charge_rate, self.battery.model, all_soc[-1],
-                                                       self.interval_size_in_hours)
+            if constrain_charge_rate:
+                charge_rate = get_feasible_charge_rate(charge_rate, model, soc, interval_size_in_hours)
 
             # Update running variables.  Note that change in battery soc is reflected in next interval.
-            all_charge_rates.append(charge_rate)
-            all_soc.append(
-                all_soc[-1] + charge_rate_to_change_in_soc(charge_rate, self.battery.model.capacity,
-                                                           self.interval_size_in_hours))
+            all_charge_rates[i] = charge_rate
+            soc = soc + charge_rate * soc_per_watt
+            all_soc[i] = soc
+            i = i + 1
 
-        # Store solution locally
-        self.solution = pd.DataFrame(data={
-            "timestamp": scenario.index,
-            "charge_rate": all_charge_rates,
-            "soc": all_soc
-        }).set_index("timestamp")
+        return scenario.index.values, all_charge_rates, all_soc
 
-        return self.solution
+    def solve_structured(self, scenario: pd.DataFrame, battery: Optional[AbstractBattery] = None) -> np.ndarray:
+        """
+        Like solve_arrays, but returns one structured array with 'charge_rate' and 'soc' fields,
+        so each interval's pair of values sits adjacent in memory.  Consumers that scan solutions
+        row-wise get both fields from one cache line; columnar reads (buf['soc']) still work.
+        The field dtype follows solution_dtype.
+        :param scenario: scenario dataframe, see solve for details
+        :param battery: battery instance
+        :return: structured array of length n with fields 'charge_rate' (W) and 'soc' (%)
+        """
+        _, charge_rates, all_soc = self.solve_arrays(scenario, battery)
+        buf = np.empty(len(charge_rates), dtype=[("charge_rate", self.solution_dtype),
+                                                 ("soc", self.solution_dtype)])
+        buf["charge_rate"] = charge_rates
+        buf["soc"] = all_soc
+        return buf
+
+    def _solve_arrays_from_charge_rates(self, scenario: pd.DataFrame, charge_rates: np.ndarray) -> tuple:
+        """
+        Build solution arrays from an array of requested charge rates (one per interval).
+        Feasibility (battery charge rate and SOC limits) is still enforced sequentially, since each
+        interval's allowable rate depends on the SOC reached in the previous one.
+        :param scenario: scenario dataframe, see solve for details
+        :param charge_rates: requested charge rate in W for every interval
+        :return: (timestamps, charge rates in W, soc in %) as three numpy arrays
+        """
+        num_intervals = len(scenario.index)
+        model = self.battery.model
+        initial_soc = self.battery.get_current_soc()
+
+        # Factor converting a charge rate in W to a change in soc (in %) over one interval
+        rate_to_soc = self.interval_size_in_hours / model.capacity * 100
+
+        # As in the interval-by-interval path, no action is taken in the first interval
+        charge_rates = np.asarray(charge_rates, dtype=np.float64).copy()
+        charge_rates[0] = 0.0
+
+        if self.constrain_charge_rate:
+            charge_rates, all_soc = _simulate_soc(charge_rates, rate_to_soc, model.min_soc, model.max_soc,
+                                                  model.max_charge_rate, model.max_discharge_rate, initial_soc)
+        else:
+            # Without SOC constraints the trajectory is just a cumulative sum of the soc changes
+            all_soc = initial_soc + np.cumsum(charge_rates * rate_to_soc)
+
+        # The simulation runs in float64; the requested solution dtype is applied at the end
+        # (a no-op for the float64 default)
+        return (scenario.index.values,
+                charge_rates.astype(self.solution_dtype, copy=False),
+                all_soc.astype(self.solution_dtype, copy=False))
+
+    @classmethod
+    def solve_batch(cls, scenario: pd.DataFrame, batteries: list, controller_configs: list) -> np.ndarray:
+        """
+        Solve the same scenario for K (battery, controller params) candidates in one batch.
+        Useful for MPC-style rollouts and parameter sweeps, where solving each candidate via its
+        own solve() call repeats scenario parsing and runs K separate Python loops.  Candidates
+        whose controller can state its charge rates up front (via compute_charge_rates) are
+        simulated together in a single compiled pass over a (K, N) rate matrix; the rest fall back
+        to an ordinary solve() call each.
+        :param scenario: scenario dataframe, see solve for details
+        :param batteries: list of K battery instances, one per candidate
+        :param controller_configs: list of K params dicts, each used to construct one controller
+                                   of this class (as in cls(params=...))
+        :return: array of shape (K, N, 2) with charge rate in W in [..., 0] and soc in % in [..., 1];
+                 callers can slice out a candidate and build a dataframe on demand
+        """
+        num_candidates = len(controller_configs)
+        num_intervals = len(scenario.index)
+        interval_size_in_hours = resolution_in_hours(scenario)
+
+        controllers = [cls(params=config) for config in controller_configs]
+
+        out = np.empty((num_candidates, num_intervals, 2), dtype=np.float64)
+
+        # Gather the up-front charge rates where available; remember which candidates need the
+        # interval-by-interval fallback
+        charge_rates = np.zeros((num_candidates, num_intervals), dtype=np.float64)
+        batched = np.zeros(num_candidates, dtype=bool)
+        for k, (controller, battery) in enumerate(zip(controllers, batteries)):
+            controller.interval_size_in_hours = interval_size_in_hours
+            controller.battery = battery
+            rates = controller.compute_charge_rates(scenario)
+            if rates is not None and controller.constrain_charge_rate:
+                charge_rates[k, 1:] = np.asarray(rates, dtype=np.float64)[1:]
+                batched[k] = True
+            else:
+                _, rates, all_soc = controller.solve_arrays(scenario, battery)
+                out[k, :, 0] = rates
+                out[k, :, 1] = all_soc
+
+        if batched.any():
+            # Broadcast per-candidate battery limits as (K,) arrays for the compiled kernel
+            models = [battery.model for battery in batteries]
+            rate_to_soc = np.array([interval_size_in_hours / model.capacity * 100 for model in models])
+            min_soc = np.array([model.min_soc for model in models], dtype=np.float64)
+            max_soc = np.array([model.max_soc for model in models], dtype=np.float64)
+            max_charge_rate = np.array([model.max_charge_rate for model in models], dtype=np.float64)
+            max_discharge_rate = np.array([model.max_discharge_rate for model in models], dtype=np.float64)
+            initial_soc = np.array([battery.get_current_soc() for battery in batteries], dtype=np.float64)
+
+            batch = _simulate_soc_batch(charge_rates, rate_to_soc, min_soc, max_soc,
+                                        max_charge_rate, max_discharge_rate, initial_soc)
+            out[batched] = batch[batched]
+
+        return out
+
+    @staticmethod
+    def _solve_batch_constant_rate(scenario: pd.DataFrame, batteries: list, rates: np.ndarray) -> np.ndarray:
+        """
+        Batch closed form for constant-rate controllers: each trajectory is a linear soc ramp
+        clipped at the battery limit it is heading towards, so all K candidates are built with
+        one broadcast instead of a sequential simulation (see ChargeController.solve for the
+        single-candidate version).
+        :param scenario: scenario dataframe, see solve for details
+        :param batteries: list of K battery instances, one per candidate
+        :param rates: signed charge rate in W per candidate (already clamped to battery limits), shape (K,)
+        :return: array of shape (K, N, 2) with charge rate in W in [..., 0] and soc in % in [..., 1]
+        """
+        num_intervals = len(scenario.index)
+        interval_size_in_hours = resolution_in_hours(scenario)
+
+        models = [battery.model for battery in batteries]
+        rate_to_soc = np.array([interval_size_in_hours / model.capacity * 100 for model in models])
+        min_soc = np.array([model.min_soc for model in models], dtype=np.float64)
+        max_soc = np.array([model.max_soc for model in models], dtype=np.float64)
+        initial_soc = np.array([battery.get_current_soc() for battery in batteries], dtype=np.float64)
+
+        # Linear ramp per candidate, then clip towards the limit each candidate is heading for
+        # (only that side: a battery starting outside the opposite limit just ramps back in).
+        # The first column stays untouched -- it reports the starting soc.
+        soc = initial_soc[:, None] + np.arange(num_intervals)[None, :] * (rates * rate_to_soc)[:, None]
+        charging = rates >= 0
+
+        # Rates come from the soc-headroom bound directly (not from soc differences, which would
+        # wobble in the last ulp): the requested rate until the limit, then the taper rate, then zero
+        soc[charging, 1:] = np.minimum(soc[charging, 1:], max_soc[charging, None])
+        soc[~charging, 1:] = np.maximum(soc[~charging, 1:], min_soc[~charging, None])
+
+        out = np.empty((len(batteries), num_intervals, 2), dtype=np.float64)
+        out[:, 0, 0] = 0.0
+        out[charging, 1:, 0] = np.minimum(rates[charging, None],
+                                          (max_soc[charging, None] - soc[charging, :-1]) / rate_to_soc[charging, None])
+        out[~charging, 1:, 0] = np.maximum(rates[~charging, None],
+                                           (min_soc[~charging, None] - soc[~charging, :-1]) / rate_to_soc[~charging, None])
+        out[:, :, 1] = soc
+        return out
 
     def debug_message(self, *message):
         if self.debug:
@@ -1,30 +1,95 @@
+import numpy as np
 import pandas as pd
-import sys
 from typing import Optional
 from oes.battery.battery import AbstractBattery
 from oes.controllers.abstract_battery_controller import AbstractBatteryController
+from oes.util.conversions import resolution_in_hours
 
 
 class ChargeController(AbstractBatteryController):
     """ Basic battery controller that only charges battery at a static rate """
 
+    __slots__ = ("charge_rate",)
+
     def __init__(self, params: dict = {}, debug: bool = False):
         super().__init__(name=self.__class__.__name__, debug=debug)
 
-        # Set default charge rate to be maximum possible
-        self.charge_rate = sys.float_info.max
+        # Default charge rate of None means maximum possible (the battery's own limit);
+        # clearer than a float sentinel and resolved once in solve
+        self.charge_rate = None
 
         # Update all params with those that were passed in
         self.update_params(params)
 
-    def solve_one_interval(self, scenario_interval: pd.DataFrame) -> float:
+    def solve_one_interval(self, scenario_interval: tuple) -> float:
+        """ See parent AbstractBatteryController class for parameter descriptions """
+        # Resolve the None sentinel here too: schedulers drive this method directly, without
+        # going through solve() first
+        return self.battery.model.max_charge_rate if self.charge_rate is None else self.charge_rate
+
+    def compute_charge_rates(self, scenario: pd.DataFrame) -> np.ndarray:
         """ See parent AbstractBatteryController class for parameter descriptions """
-        return self.charge_rate
+        # Charge rate is static, so the full horizon can be stated up front
+        charge_rate = self.battery.model.max_charge_rate if self.charge_rate is None else self.charge_rate
+        return np.full(len(scenario.index), charge_rate)
 
-    def solve(self, scenario: pd.DataFrame, battery: Optional[AbstractBattery] = None) -> pd.DataFrame:
+    @classmethod
+    def solve_batch(cls, scenario: pd.DataFrame, batteries: list, controller_configs: list) -> np.ndarray:
+        """ See parent AbstractBatteryController class for parameter descriptions """
+        controllers = [cls(params=config) for config in controller_configs]
+
+        # The broadcast closed form assumes the default soc-constrained behaviour and
+        # non-negative rates; anything else goes through the generic batch path
+        rates = np.array([battery.model.max_charge_rate if controller.charge_rate is None
+                          else min(controller.charge_rate, battery.model.max_charge_rate)
+                          for controller, battery in zip(controllers, batteries)])
+        if any(not controller.constrain_charge_rate for controller in controllers) or (rates < 0).any():
+            return super().solve_batch(scenario, batteries, controller_configs)
+
+        return cls._solve_batch_constant_rate(scenario, batteries, rates)
+
+    def solve_arrays(self, scenario: pd.DataFrame, battery: Optional[AbstractBattery] = None) -> tuple:
         """ See parent AbstractBatteryController class for parameter descriptions """
 
         # Ensure charge rate does not exceed battery maximum allowed charge rate
-        self.charge_rate = min(self.charge_rate, battery.model.max_charge_rate)
+        # (None means charge as fast as the battery allows)
+        if self.charge_rate is None:
+            self.charge_rate = battery.model.max_charge_rate
+        else:
+            self.charge_rate = min(self.charge_rate, battery.model.max_charge_rate)
+
+        # Charging at a constant rate has a closed-form trajectory: soc rises linearly until it
+        # hits max_soc (the partial interval at the crossover included), then holds.  Build it
+        # directly rather than simulating interval by interval.  A (non-standard) negative charge
+        # rate is left to the generic parent path, which handles the discharge limits.
+        if self.charge_rate >= 0:
+            self.battery = battery
+            if self.fixed_interval_size_in_hours is not None:
+                self.interval_size_in_hours = self.fixed_interval_size_in_hours
+            else:
+                self.interval_size_in_hours = resolution_in_hours(scenario)
+
+            model = battery.model
+            rate_to_soc = self.interval_size_in_hours / model.capacity * 100
+            num_intervals = len(scenario.index)
+
+            # No action in the first interval, as in the generic path
+            soc = battery.get_current_soc() + np.arange(num_intervals) * (self.charge_rate * rate_to_soc)
+            charge_rates = np.empty(num_intervals, dtype=np.float64)
+            charge_rates[0] = 0.0
+            if self.constrain_charge_rate:
+                # Rates from the soc-headroom bound directly (not from soc differences, which
+                # would wobble in the last ulp): the requested rate until max_soc, then the
+                # taper rate, then zero.  The first soc entry is left untouched: it reports the
+                # starting soc, which may sit above max_soc (in which case the battery drops to
+                # max_soc in the next interval).
+                np.minimum(soc[1:], model.max_soc, out=soc[1:])
+                charge_rates[1:] = np.minimum(self.charge_rate, (model.max_soc - soc[:-1]) / rate_to_soc)
+            else:
+                charge_rates[1:] = self.charge_rate
+
+            return (scenario.index.values,
+                    charge_rates.astype(self.solution_dtype, copy=False),
+                    soc.astype(self.solution_dtype, copy=False))
 
-        return super().solve(scenario, battery)
+        return super().solve_arrays(scenario, battery)
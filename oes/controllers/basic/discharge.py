@@ -1,30 +1,98 @@
+import numpy as np
 import pandas as pd
-import sys
 from typing import Optional
 from oes.battery.battery import AbstractBattery
 from oes.controllers.abstract_battery_controller import AbstractBatteryController
+from oes.util.conversions import resolution_in_hours
 
 
 class DischargeController(AbstractBatteryController):
     """ Basic battery controller that only discharges battery at a static rate """
 
+    __slots__ = ("discharge_rate",)
+
     def __init__(self, params: dict = {}, debug: bool = False):
         super().__init__(name=self.__class__.__name__, debug=debug)
 
-        # Set default discharge rate to be maximum possible
-        self.discharge_rate = sys.float_info.max
+        # Default discharge rate of None means maximum possible (the battery's own limit);
+        # clearer than a float sentinel and resolved once in solve
+        self.discharge_rate = None
 
         # Update all params with those that were passed in
         self.update_params(params)
 
-    def solve_one_interval(self, scenario_interval: pd.DataFrame) -> float:
+    def solve_one_interval(self, scenario_interval: tuple) -> float:
+        """ See parent AbstractBatteryController class for parameter descriptions """
+        # Resolve the None sentinel here too: schedulers drive this method directly, without
+        # going through solve() first
+        discharge_rate = self.battery.model.max_discharge_rate if self.discharge_rate is None \
+            else self.discharge_rate
+        return -1 * discharge_rate
+
+    def compute_charge_rates(self, scenario: pd.DataFrame) -> np.ndarray:
         """ See parent AbstractBatteryController class for parameter descriptions """
-        return -1 * self.discharge_rate
+        # Discharge rate is static, so the full horizon can be stated up front -- this skips the
+        # per-interval Python loop (and any per-row materialisation) entirely
+        discharge_rate = self.battery.model.max_discharge_rate if self.discharge_rate is None else self.discharge_rate
+        return np.full(len(scenario.index), -1 * discharge_rate)
 
-    def solve(self, scenario: pd.DataFrame, battery: Optional[AbstractBattery] = None) -> pd.DataFrame:
+    @classmethod
+    def solve_batch(cls, scenario: pd.DataFrame, batteries: list, controller_configs: list) -> np.ndarray:
+        """ See parent AbstractBatteryController class for parameter descriptions """
+        controllers = [cls(params=config) for config in controller_configs]
+
+        # The broadcast closed form assumes the default soc-constrained behaviour and
+        # non-negative discharge rates; anything else goes through the generic batch path
+        rates = np.array([-1 * (battery.model.max_discharge_rate if controller.discharge_rate is None
+                                else min(controller.discharge_rate, battery.model.max_discharge_rate))
+                          for controller, battery in zip(controllers, batteries)])
+        if any(not controller.constrain_charge_rate for controller in controllers) or (rates > 0).any():
+            return super().solve_batch(scenario, batteries, controller_configs)
+
+        return cls._solve_batch_constant_rate(scenario, batteries, rates)
+
+    def solve_arrays(self, scenario: pd.DataFrame, battery: Optional[AbstractBattery] = None) -> tuple:
         """ See parent AbstractBatteryController class for parameter descriptions """
 
         # Ensure discharge rate does not exceed battery maximum allowed discharge rate
-        self.discharge_rate = min(self.discharge_rate, battery.model.max_discharge_rate)
+        # (None means discharge as fast as the battery allows)
+        if self.discharge_rate is None:
+            self.discharge_rate = battery.model.max_discharge_rate
+        else:
+            self.discharge_rate = min(self.discharge_rate, battery.model.max_discharge_rate)
+
+        # Discharging at a constant rate has a closed-form trajectory (the mirror image of
+        # ChargeController): soc falls linearly until it hits min_soc, then holds.  Build it
+        # directly rather than simulating interval by interval.  A (non-standard) negative
+        # discharge rate is left to the generic parent path.
+        if self.discharge_rate >= 0:
+            self.battery = battery
+            if self.fixed_interval_size_in_hours is not None:
+                self.interval_size_in_hours = self.fixed_interval_size_in_hours
+            else:
+                self.interval_size_in_hours = resolution_in_hours(scenario)
+
+            model = battery.model
+            rate_to_soc = self.interval_size_in_hours / model.capacity * 100
+            num_intervals = len(scenario.index)
+
+            # No action in the first interval, as in the generic path
+            soc = battery.get_current_soc() - np.arange(num_intervals) * (self.discharge_rate * rate_to_soc)
+            charge_rates = np.empty(num_intervals, dtype=np.float64)
+            charge_rates[0] = 0.0
+            if self.constrain_charge_rate:
+                # Rates from the soc-headroom bound directly (not from soc differences, which
+                # would wobble in the last ulp): the requested rate until min_soc, then the
+                # taper rate, then zero.  The first soc entry is left untouched: it reports the
+                # starting soc, which may sit below min_soc (in which case the battery rises to
+                # min_soc in the next interval).
+                np.maximum(soc[1:], model.min_soc, out=soc[1:])
+                charge_rates[1:] = np.maximum(-1 * self.discharge_rate, (model.min_soc - soc[:-1]) / rate_to_soc)
+            else:
+                charge_rates[1:] = -1 * self.discharge_rate
+
+            return (scenario.index.values,
+                    charge_rates.astype(self.solution_dtype, copy=False),
+                    soc.astype(self.solution_dtype, copy=False))
 
-        return super().solve(scenario, battery)
+        return super().solve_arrays(scenario, battery)
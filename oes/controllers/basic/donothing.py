@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from typing import Optional
 from oes.battery.battery import AbstractBattery
@@ -10,16 +11,29 @@ class DoNothingController(AbstractBatteryController):
     (This is useful e.g. as baseline for comparison, or to build up a scheduler)
     """
 
+    __slots__ = ()
+
     def __init__(self, params: dict = {}, debug: bool = False):
         super().__init__(name=self.__class__.__name__, debug=debug)
 
         # Update all params with those that were passed in
         self.update_params(params)
 
-    def solve_one_interval(self, scenario_interval: pd.DataFrame) -> float:
+    def solve_one_interval(self, scenario_interval: tuple) -> float:
         """ See parent AbstractBatteryController class for parameter descriptions """
         return 0.0
 
-    def solve(self, scenario: pd.DataFrame, battery: Optional[AbstractBattery] = None) -> pd.DataFrame:
+    def solve_arrays(self, scenario: pd.DataFrame, battery: Optional[AbstractBattery] = None) -> tuple:
         """ See parent AbstractBatteryController class for parameter descriptions """
-        return super().solve(scenario, battery)
+        # A starting soc outside the battery's limits is not actually a flat trajectory: the
+        # generic path clamps it back into range in the first active interval, so defer to it
+        if not battery.validate_soc():
+            return super().solve_arrays(scenario, battery)
+
+        # Doing nothing needs no simulation at all: zero charge rates and a flat soc, built as
+        # preallocated arrays without any per-interval work
+        self.battery = battery
+        num_intervals = len(scenario.index)
+        return (scenario.index.values,
+                np.zeros(num_intervals, dtype=self.solution_dtype),
+                np.full(num_intervals, battery.get_current_soc(), dtype=self.solution_dtype))
@@ -1,17 +1,63 @@
 import pandas as pd
 import numpy as np
 import sys
-import datetime as dt
+import time
 import warnings
 import copy
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple, Optional
 
 from oes.controllers.abstract_battery_controller import AbstractBatteryController
 from oes.battery.battery import AbstractBattery, SimulatedBattery
 from oes.util.conversions import change_in_soc_to_charge_rate, resolution_in_hours
 from oes.util.output import pretty_time
-from oes.util.cost_function_helpers import compute_state_transition_cost
 from oes.util.general import get_discretisation_offset
+from oes.util.jit import njit, numba_available, prange
+
+
+@njit(cache=True, parallel=True, nogil=True)
+def _dp_kernel(ctg, cf, sc, num_time_intervals, num_soc_states,
+               state_transition_cost, within_limits, solar_curtailment_w,
+               early_charge_bias, use_early_charge_bias, d_all):
+    """
+    Scalar dynamic-program kernel, compiled by numba when it is installed.  Implements the same
+    update rules as the vectorised fallback in _run_dynamic_program (see there for the semantics,
+    including the near-tie rule), but as plain typed loops, which LLVM turns into tight native
+    code with no intermediate arrays at all.  Only called when numba is actually available --
+    without compilation these loops would be far slower than the numpy path.
+
+    All cost arithmetic is hoisted: the (time, soc difference) transition cost, limit and
+    curtailment tables are precomputed by the caller, and the (time, state) early-charge bias is
+    the only separable term added here.  Columns must stay sequential (each column reads the
+    next one), but within a column every previous soc state only reads the read-only next column
+    and writes its own cells, so the state loop runs under prange.
+    """
+    band_width = len(d_all)
+    for col in range(num_time_intervals - 2, -1, -1):
+        stc_col = state_transition_cost[col]
+        within_limits_col = within_limits[col]
+        curtailment_col = solar_curtailment_w[col]
+        bias_col = early_charge_bias[col] if use_early_charge_bias else early_charge_bias[0]
+
+        for prev_row in prange(num_soc_states):
+            current = ctg[prev_row, col]
+            for band_index in range(band_width):
+                if not within_limits_col[band_index]:
+                    continue
+                d = d_all[band_index]
+                row = prev_row + d
+                if row < 0 or row >= num_soc_states:
+                    continue
+                cost = stc_col[band_index]
+                if use_early_charge_bias:
+                    cost = cost + bias_col[row]
+                this_cost_to_get_there = ctg[row, col + 1] + cost
+                if (this_cost_to_get_there + 0.0001) < current or \
+                        (d > 0 and abs(this_cost_to_get_there - current) < 0.001):
+                    current = this_cost_to_get_there
+                    ctg[prev_row, col] = this_cost_to_get_there
+                    cf[prev_row, col] = row
+                    sc[prev_row, col] = curtailment_col[band_index]
 
 
 class LimitMode:
@@ -51,6 +97,11 @@ class DynamicProgramController(AbstractBatteryController):
         self.include_charge_loss: bool = False  # Whether to multiply by a loss factor for (dis-)charging of battery
         self.allow_solar_curtailment: bool = False  # Allow consideration of solar curtailment at each interval
         self.use_interval_weights: bool = False  # Whether to use individual weights for each interval
+        # Dtype of the DP cost matrices.  np.float32 halves memory traffic on long horizons (the
+        # sweep is memory-bound); the tie-break thresholds of 1e-4 sit well above float32
+        # epsilon at typical cost magnitudes, but accumulated rounding can still flip near-ties,
+        # so full precision remains the default
+        self.matrix_dtype: type = np.float64
 
         # ----------------------------------------------------------------------------
         # Update the above with input params, which also validates the params
@@ -68,13 +119,13 @@ class DynamicProgramController(AbstractBatteryController):
 
         # ----------------------------------------------------------------------------
         # Initialise variables that will hold time series data
-        self.generation: Optional[list] = None  # Generation time series data
-        self.demand: Optional[list] = None  # Demand time series data
-        self.tariff_import: Optional[list] = None  # Import tariff time series data
-        self.tariff_export: Optional[list] = None  # Export tariff time series data
-        self.limit_import_time_series: Optional[list] = None  # Import limit time series data
-        self.limit_export_time_series: Optional[list] = None  # Export limit time series data
-        self.interval_weights: Optional[list] = None  # Individual weights for each interval
+        self.generation: Optional[np.ndarray] = None  # Generation time series data
+        self.demand: Optional[np.ndarray] = None  # Demand time series data
+        self.tariff_import: Optional[np.ndarray] = None  # Import tariff time series data
+        self.tariff_export: Optional[np.ndarray] = None  # Export tariff time series data
+        self.limit_import_time_series: Optional[np.ndarray] = None  # Import limit time series data
+        self.limit_export_time_series: Optional[np.ndarray] = None  # Export limit time series data
+        self.interval_weights: Optional[np.ndarray] = None  # Individual weights for each interval
 
         # ----------------------------------------------------------------------------
         # Initialise variable that will hold battery model
@@ -88,9 +139,9 @@ class DynamicProgramController(AbstractBatteryController):
 
         # ----------------------------------------------------------------------------
         # Initialise variables that will hold solution outputs of dynamic program
-        self.optimal_profile: Optional[list] = None
-        self.charge_rate: Optional[list] = None
-        self.solar_curtailment: Optional[list] = None
+        self.optimal_profile: Optional[np.ndarray] = None
+        self.charge_rate: Optional[np.ndarray] = None
+        self.solar_curtailment: Optional[np.ndarray] = None
 
     def update_params(self, params: dict) -> None:
         """
@@ -131,31 +182,37 @@ class DynamicProgramController(AbstractBatteryController):
         self.interval_size_in_hours = resolution_in_hours(scenario)
 
         # These four columns will always be provided as time series data.
-        # For more readable code, store them locally
-        self.generation = scenario["generation"]
-        self.demand = scenario["demand"]
-        self.tariff_import = scenario["tariff_import"]
-        self.tariff_export = scenario["tariff_export"]
+        # For more readable code, store them locally -- as contiguous float64 ndarrays, not
+        # pandas Series: every access by interval below is then a C-level positional index
+        # rather than a pandas label lookup
+        self.generation = np.ascontiguousarray(scenario["generation"].to_numpy(dtype=np.float64))
+        self.demand = np.ascontiguousarray(scenario["demand"].to_numpy(dtype=np.float64))
+        self.tariff_import = np.ascontiguousarray(scenario["tariff_import"].to_numpy(dtype=np.float64))
+        self.tariff_export = np.ascontiguousarray(scenario["tariff_export"].to_numpy(dtype=np.float64))
 
         # Optionally, we can include weights for each interval (e.g. dependent on forecast confidence, for example)
         if self.use_interval_weights:
             if 'weights' not in scenario.columns:
                 raise AttributeError("If using 'use_interval_weights=True', scenario must contain interval weights")
-            self.interval_weights = scenario['weights']
+            self.interval_weights = np.ascontiguousarray(scenario['weights'].to_numpy(dtype=np.float64))
 
         # Import and export limits may be set as no_limit, static_limit, or dynamic_limit
         if self.limit_import_mode == LimitMode.no_limit:
-            self.limit_import_time_series = [sys.float_info.max] * self.num_time_intervals
+            self.limit_import_time_series = np.full(self.num_time_intervals, sys.float_info.max)
         elif self.limit_import_mode == LimitMode.static_limit:
-            self.limit_import_time_series = [self.limit_import_value] * self.num_time_intervals
+            self.limit_import_time_series = np.full(self.num_time_intervals, self.limit_import_value,
+                                                    dtype=np.float64)
         elif self.limit_import_mode == LimitMode.dynamic_limit:
-            self.limit_import_time_series = scenario["limit_import"]
+            self.limit_import_time_series = np.ascontiguousarray(
+                scenario["limit_import"].to_numpy(dtype=np.float64))
         if self.limit_export_mode == LimitMode.no_limit:
-            self.limit_export_time_series = [sys.float_info.max] * self.num_time_intervals
+            self.limit_export_time_series = np.full(self.num_time_intervals, sys.float_info.max)
         elif self.limit_export_mode == LimitMode.static_limit:
-            self.limit_export_time_series = [self.limit_export_value] * self.num_time_intervals
+            self.limit_export_time_series = np.full(self.num_time_intervals, self.limit_export_value,
+                                                    dtype=np.float64)
         elif self.limit_export_mode == LimitMode.dynamic_limit:
-            self.limit_export_time_series = scenario["limit_export"]
+            self.limit_export_time_series = np.ascontiguousarray(
+                scenario["limit_export"].to_numpy(dtype=np.float64))
 
         # Store battery locally -- as a copy, in case small changes are made.  Remember initial SOC.
         self.battery = copy.copy(battery)
@@ -191,7 +248,7 @@ class DynamicProgramController(AbstractBatteryController):
 
     def debug_msg_post_dynamic_program(self, timestamp_start) -> None:
         """ Debug message after dynamic program completed """
-        time_total = dt.datetime.now().timestamp() - timestamp_start
+        time_total = time.perf_counter() - timestamp_start
         self.debug_message("Total run time:", pretty_time(time_total))
 
     def _initialise_dp(self) -> None:
@@ -233,17 +290,29 @@ class DynamicProgramController(AbstractBatteryController):
                 f"of {self.soc_interval}")
             self.battery.model.max_soc = self.battery.model.max_soc - battery_max_soc_offset
 
-        # Initialise CTG (cost to go), CF (came from), SC (solar curtail) matrices
-        self.CTG = np.full((self.num_soc_states, self.num_time_intervals), sys.float_info.max)
-        self.SC = np.full((self.num_soc_states, self.num_time_intervals - 1), 0.0)
-        self.CF = np.empty((self.num_soc_states, self.num_time_intervals - 1))
-        for i in range(0, self.num_soc_states):
-            for j in range(0, self.num_time_intervals - 1):
-                self.CF[i][j] = i
-
-        # CTG last column must be zeros
-        for i in range(0, self.num_soc_states):
-            self.CTG[i][self.num_time_intervals - 1] = 0
+        # Initialise CTG (cost to go), CF (came from), SC (solar curtail) matrices.  CTG starts
+        # at infinity ("not yet reachable") except for the last column, which must be zeros.
+        # CF holds soc state indices, so it is integer-typed; each column starts as "came from
+        # itself", written as one broadcast store rather than S*T Python assignments.
+        # When the controller is reused for repeated solves of the same grid size (e.g. a
+        # rolling horizon), the matrices from the previous call are reset in place rather than
+        # re-allocated -- for long horizons these are the largest allocations in the solve.
+        # The matrices are Fortran-ordered: the sweep reads and writes whole soc columns, so
+        # laying the soc axis out contiguously makes every CTG[:, col] slice unit-stride.
+        ctg_shape = (self.num_soc_states, self.num_time_intervals)
+        cf_dtype = np.uint16 if self.num_soc_states <= np.iinfo(np.uint16).max else np.int32
+        if self.CTG is not None and self.CTG.shape == ctg_shape \
+                and self.CTG.dtype == np.dtype(self.matrix_dtype) and self.CF.dtype == cf_dtype:
+            self.CTG.fill(np.inf)
+            self.SC.fill(0.0)
+            self.CF[:] = np.arange(self.num_soc_states, dtype=cf_dtype)[:, np.newaxis]
+        else:
+            self.CTG = np.full(ctg_shape, np.inf, dtype=self.matrix_dtype, order='F')
+            self.SC = np.zeros((self.num_soc_states, self.num_time_intervals - 1),
+                               dtype=self.matrix_dtype, order='F')
+            self.CF = np.broadcast_to(np.arange(self.num_soc_states, dtype=cf_dtype)[:, np.newaxis],
+                                      (self.num_soc_states, self.num_time_intervals - 1)).copy(order='F')
+        self.CTG[:, -1] = 0.0
 
         # If we want a specific final soc then bias starting conditions
         if self.constrain_final_soc:
@@ -333,78 +402,168 @@ class DynamicProgramController(AbstractBatteryController):
 
     def _run_dynamic_program(self) -> None:
         """
-        Run the actual dynamic program that calculates all values in all matrices
+        Run the actual dynamic program that calculates all values in all matrices.
+        The loop over previous soc states is vectorised: for a fixed (interval, next state) pair
+        every candidate previous state is an independent cell update, so the whole feasible band
+        is evaluated with array operations.  Only the loops over intervals and next states remain
+        in Python; their iterations are order-dependent (the near-tie rule below compares against
+        the best cost found by earlier next states).
         :return: None
         """
 
-        timestamp_start = dt.datetime.now().timestamp()
+        timestamp_start = time.perf_counter()
         self.debug_msg_pre_dynamic_program()
 
+        # Local aliases for the time series -- already contiguous float64 ndarrays
+        # (see _process_inputs), so everything below is plain ndarray arithmetic
+        demand = self.demand
+        generation = self.generation
+        tariff_import = self.tariff_import
+        tariff_export = self.tariff_export
+        limit_import = self.limit_import_time_series
+        limit_export = self.limit_export_time_series
+        interval_weights = self.interval_weights if self.use_interval_weights else None
+
+        num_soc_states = self.num_soc_states
+        interval_size_in_hours = self.interval_size_in_hours
+        model = self.battery.model
+
+        # Battery impact and degradation cost depend only on the difference between the two soc
+        # states, so precompute them for every possible difference once, outside the time loop.
+        # d = row - prev_row, spanning the full feasible band.
+        d_lo = -self.max_soc_increase_interval
+        d_all = np.arange(d_lo, -self.max_soc_decrease_interval + 1)
+        change_soc_percent_all = d_all * self.soc_interval
+        change_soc_wh_all = model.compute_soc_change_wh(change_soc_percent_all)
+        battery_impact_w_all = model.determine_impact_charge_rate_efficiency(
+            change_soc_wh_all / interval_size_in_hours)
+        degradation_cost_all = model.compute_degradation_cost(change_soc_wh_all) \
+            if self.include_battery_degradation_cost else None
+
+        # The state transition cost is a function of (interval, soc difference) only -- the same
+        # difference recurs for every soc state -- so the full (T, W) cost, limit and curtailment
+        # tables are built once with broadcasting, moving all cost arithmetic out of the
+        # O(T*S*W) sweep into O(T*W).  Inside the sweep only lookups and adds remain.
+        net_grid_impact_w_all = (demand - generation)[:, np.newaxis] + battery_impact_w_all[np.newaxis, :]
+        within_limits_all = (net_grid_impact_w_all >= -1 * limit_export[:, np.newaxis]) & \
+                            (net_grid_impact_w_all <= limit_import[:, np.newaxis])
+        # Branchless import/export split: the positive part of the net grid impact is charged at
+        # the import tariff, the negative part credited at the export tariff (one of the two is
+        # always zero), avoiding a select over two fully-evaluated products.  The Wh-to-kWh
+        # normalisation is folded into the per-interval tariffs (length T) rather than applied
+        # to the full (T, W) matrix.
+        net_grid_impact_wh_all = net_grid_impact_w_all * interval_size_in_hours
+        import_cost_per_wh = tariff_import / 1000
+        export_cost_per_wh = tariff_export / 1000
+        state_transition_cost_all = \
+            np.maximum(net_grid_impact_wh_all, 0.0) * import_cost_per_wh[:, np.newaxis] + \
+            np.minimum(net_grid_impact_wh_all, 0.0) * export_cost_per_wh[:, np.newaxis]
+
+        # If we are taking battery degradation cost into account, add relevant amount
+        if degradation_cost_all is not None:
+            state_transition_cost_all = state_transition_cost_all + degradation_cost_all[np.newaxis, :]
+
+        # If we want to minimise charging activity, add a small cost when charging or discharging
+        if self.minimize_activity:
+            state_transition_cost_all = state_transition_cost_all + 0.001 * (d_all != 0)[np.newaxis, :]
+
+        # If we want to use weights for each interval, multiply by weight for each interval
+        # (the early-charge bias is part of the transition cost, so it is weighted too)
+        if interval_weights is not None:
+            state_transition_cost_all = state_transition_cost_all * interval_weights[:, np.newaxis]
+
+        # Solar curtailment: only when allowed, export tariff negative, and about to export.
+        # Curtail solar generation only to the point of creating zero net grid impact.
+        if self.allow_solar_curtailment:
+            solar_curtailment_all = np.where((tariff_export[:, np.newaxis] < 0) & (net_grid_impact_w_all < 0),
+                                             np.minimum(-1 * net_grid_impact_w_all, generation[:, np.newaxis]),
+                                             0.0)
+        else:
+            solar_curtailment_all = np.zeros_like(net_grid_impact_w_all)
+
+        # Cast the cost tables to the configured matrix dtype (no-op at the float64 default, so
+        # the tables are still built at full precision first)
+        state_transition_cost_all = state_transition_cost_all.astype(self.matrix_dtype, copy=False)
+        solar_curtailment_all = solar_curtailment_all.astype(self.matrix_dtype, copy=False)
+
+        # The early-charge bias is separable in (interval, next state); it is the only cost term
+        # that cannot be folded into the (T, W) table
+        if self.prioritize_early_charge:
+            bias_rows = (num_soc_states - np.arange(num_soc_states)) / num_soc_states / 500
+            weight_col = interval_weights if interval_weights is not None \
+                else np.ones(self.num_time_intervals)
+            early_charge_bias_all = (weight_col[:, np.newaxis] * bias_rows[np.newaxis, :]) \
+                .astype(self.matrix_dtype, copy=False)
+        else:
+            early_charge_bias_all = None
+
+        # With numba installed, the compiled scalar kernel beats the vectorised sweep below (no
+        # per-column temporaries at all); without it, the kernel would be a plain Python triple
+        # loop and much slower, so fall through to the numpy implementation instead.  The bias
+        # table is passed as a dummy array plus a flag, keeping the kernel signature monomorphic.
+        if numba_available:
+            _dp_kernel(self.CTG, self.CF, self.SC, self.num_time_intervals, num_soc_states,
+                       np.ascontiguousarray(state_transition_cost_all),
+                       np.ascontiguousarray(within_limits_all),
+                       np.ascontiguousarray(solar_curtailment_all),
+                       np.empty((1, num_soc_states), dtype=self.matrix_dtype) if early_charge_bias_all is None
+                       else np.ascontiguousarray(early_charge_bias_all),
+                       early_charge_bias_all is not None,
+                       np.ascontiguousarray(d_all))
+            self.debug_msg_post_dynamic_program(timestamp_start)
+            return
+
+        # The state dimension is swept with whole-array operations: per column this is W passes
+        # over length-S vectors (W = band width), no per-state recomputation of anything
+        all_rows = np.arange(num_soc_states)
+
         # Work our way backwards from last column of matrix to first column
         for col in range(self.num_time_intervals - 2, -1, -1):
 
             # Progress update
             self.debug_msg_update_dynamic_program(col)
 
-            # Work our way up through all possible soc states
-            for row in range(0, self.num_soc_states):
-
-                # Find range of soc states that could reach this state
-                prev_row_min = int(max(0, row + self.max_soc_decrease_interval))
-                prev_row_max = int(min(self.num_soc_states - 1, row + self.max_soc_increase_interval))
-
-                for prev_row in range(prev_row_min, prev_row_max + 1):
-
-                    # Calculate change in SOC, battery impact, solar curtailment, net grid impact
-                    change_soc_percent, change_soc_wh = self._compute_change_soc(prev_row, row)
-                    battery_impact_w, battery_impact_wh = self._compute_battery_impact(change_soc_percent)
-                    solar_curtailment_w, solar_curtailment_wh = self._compute_solar_curtailment(col, battery_impact_w)
-                    net_grid_impact_w, net_grid_impact_wh = self._compute_net_grid_impact(col, battery_impact_w)
-
-                    # Check if this state transition is ok (no import or export limit exceeded), and ignore it if not
-                    if not self._check_state_transition_within_limits(col, net_grid_impact_w):
-                        continue
-
-                    # State transition cost is calculated using net grid impact in Wh
-                    state_transition_cost = compute_state_transition_cost(
-                        net_grid_impact_wh,
-                        self.tariff_import[col],
-                        self.tariff_export[col]
-                    )
-
-                    # If we are taking battery degradation cost into account, add relevant amount
-                    if self.include_battery_degradation_cost:
-                        degradation_cost = self.battery.model.compute_degradation_cost(change_soc_wh)
-                        state_transition_cost = state_transition_cost + degradation_cost
-
-                    # If we want to minimise charging activity, add a small cost when charging or discharging
-                    if self.minimize_activity:
-                        if not prev_row == row:
-                            state_transition_cost = state_transition_cost + 0.001
-
-                    # If we want to prioritise full charge earlier, add small cost to later intervals
-                    if self.prioritize_early_charge:
-                        state_transition_cost = state_transition_cost + \
-                                                (self.num_soc_states - row) / self.num_soc_states / 500
-
-                    # If we want to use weights for each interval, multiply by weight for this interval
-                    if self.use_interval_weights:
-                        state_transition_cost = state_transition_cost * self.interval_weights[col]
-
-                    # Calculate total cost to get there including this state transition
-                    this_cost_to_get_there = self.CTG[row][col + 1] + state_transition_cost
-
-                    # If this is better than existing entry, update
-                    if (this_cost_to_get_there + 0.0001) < self.CTG[prev_row][col]:
-                        self.CTG[prev_row][col] = this_cost_to_get_there
-                        self.CF[prev_row][col] = row
-                        self.SC[prev_row][col] = solar_curtailment_w
-
-                    # Else if this is similar but has higher soc, update
-                    elif (abs(this_cost_to_get_there - self.CTG[prev_row][col]) < 0.001) and (row > prev_row):
-                        self.CTG[prev_row][col] = this_cost_to_get_there
-                        self.CF[prev_row][col] = row
-                        self.SC[prev_row][col] = solar_curtailment_w
+            # Per-column band quantities are plain rows of the precomputed tables
+            within_limits = within_limits_all[col]
+            state_transition_cost = state_transition_cost_all[col]
+            solar_curtailment_w = solar_curtailment_all[col]
+            early_charge_bias = early_charge_bias_all[col] if early_charge_bias_all is not None else None
+
+            ctg_next = self.CTG[:, col + 1]
+            ctg_col = self.CTG[:, col]
+            cf_col = self.CF[:, col]
+            sc_col = self.SC[:, col]
+
+            # Sweep the band in ascending soc difference: for every cell this processes candidate
+            # next states in ascending order, which is what the near-tie rule below relies on
+            for band_index, d in enumerate(d_all):
+                if not within_limits[band_index]:
+                    continue
+
+                # Previous states for which the next state prev + d lies on the grid
+                lo = max(0, -d)
+                hi = min(num_soc_states, num_soc_states - d)
+                rows = all_rows[lo + d:hi + d]
+
+                # Calculate total cost to get there including this state transition
+                this_cost_to_get_there = ctg_next[lo + d:hi + d] + state_transition_cost[band_index]
+
+                # If we want to prioritise full charge earlier, add small cost to later intervals
+                if early_charge_bias is not None:
+                    this_cost_to_get_there = this_cost_to_get_there + early_charge_bias[lo + d:hi + d]
+
+                # Update cells that are clearly better, plus near-ties where the next state has
+                # higher soc than the previous state (preferring to hold charge)
+                current = ctg_col[lo:hi]
+                better = (this_cost_to_get_there + 0.0001) < current
+                if d > 0:
+                    update = better | (np.abs(this_cost_to_get_there - current) < 0.001)
+                else:
+                    update = better
+                if update.any():
+                    current[update] = this_cost_to_get_there[update]
+                    cf_col[lo:hi][update] = rows[update]
+                    sc_col[lo:hi][update] = solar_curtailment_w[band_index]
 
         # Debug message after dynamic program completed
         self.debug_msg_post_dynamic_program(timestamp_start)
@@ -412,33 +571,59 @@ class DynamicProgramController(AbstractBatteryController):
     def _calculate_optimal_profile(self) -> None:
         """
         Assuming dynamic program has been solved, calculate optimal profile by walking through solved matrix.
+        Only the index chain is sequential (each step depends on the previous); the soc values,
+        charge rates and curtailment are all derived from it with vectorised expressions.
         :return: None
         """
+        num_steps = self.num_time_intervals
+        model = self.battery.model
+
+        # Determine best route from starting soc: walk the came-from matrix forwards
+        indices = np.empty(num_steps, dtype=np.int32)
+        indices[0] = int((self.initial_soc - model.min_soc) / self.soc_interval)
+        came_from = self.CF
+        for i in range(num_steps - 1):
+            indices[i + 1] = came_from[indices[i], i]
+
+        # Soc at every step; the first entry reports the actual initial soc, which may sit
+        # off-grid if it was not an exact multiple of soc_interval
+        optimal_profile = indices * self.soc_interval + model.min_soc
+        optimal_profile[0] = self.initial_soc
+
+        # Charge rates follow from the soc differences in one vectorised conversion; last entry
+        # stays zero so all arrays have the same length
+        charge_rate = np.zeros(num_steps)
+        charge_rate[:-1] = change_in_soc_to_charge_rate(np.diff(optimal_profile), model.capacity,
+                                                        self.interval_size_in_hours)
+
+        # Solar curtailment along the chosen route, gathered in one fancy-indexing pass
+        solar_curtailment = np.zeros(num_steps)
+        solar_curtailment[:-1] = self.SC[indices[1:], np.arange(num_steps - 1)]
+
+        self.optimal_profile = optimal_profile
+        self.charge_rate = charge_rate
+        self.solar_curtailment = solar_curtailment
+
+    @classmethod
+    def solve_scenarios(cls, scenarios: list, battery: AbstractBattery, params: dict = {},
+                        max_workers: Optional[int] = None) -> list:
+        """
+        Solve several independent scenarios (e.g. Monte Carlo draws or rolling-horizon windows)
+        in parallel.  Each scenario gets its own controller instance, since solve mutates
+        controller state; the battery is shared read-only (each solve works on its own copy).
+        Threads overlap usefully because the DP kernel releases the GIL when numba is installed,
+        and the table precompute spends its time in numpy either way.
+        :param scenarios: list of scenario DataFrames, each as expected by solve
+        :param battery: battery instance to use for every scenario
+        :param params: controller parameters, applied to every instance
+        :param max_workers: passed to ThreadPoolExecutor; None lets the pool size itself
+        :return: list of solution DataFrames in the same order as the input scenarios
+        """
+        def solve_one(scenario):
+            return cls(params=dict(params)).solve(scenario, battery)
 
-        # Determine best route from starting soc, and track some values of interest
-        next_soc = self.initial_soc
-        self.optimal_profile = [next_soc]
-        self.charge_rate = []
-        self.solar_curtailment = []
-
-        next_index = int((self.initial_soc - self.battery.model.min_soc) / self.soc_interval)
-
-        # Traveling forwards through DP solution
-        for i in range(0, self.num_time_intervals - 1):
-            next_index = int(self.CF[next_index, i])
-            this_soc = next_soc
-            next_soc = (next_index * self.soc_interval) + self.battery.model.min_soc
-            next_charge_rate = change_in_soc_to_charge_rate(next_soc - this_soc, self.battery.model.capacity,
-                                                            self.interval_size_in_hours)
-
-            # Update arrays
-            self.optimal_profile.append(next_soc)
-            self.charge_rate.append(next_charge_rate)
-            self.solar_curtailment.append(self.SC[next_index, i])
-
-        # Add zeros to ends of solar_curtailment and charge_rate to ensure same array lengths
-        self.solar_curtailment.append(0)
-        self.charge_rate.append(0)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(solve_one, scenarios))
 
     def solve(self, scenario, battery: Optional[AbstractBattery] = None):
         """ See parent AbstractBatteryController class for parameter descriptions """
@@ -455,12 +640,11 @@ class DynamicProgramController(AbstractBatteryController):
         # Calculate optimal profile
         self._calculate_optimal_profile()
 
-        # Store solution locally
+        # Store solution locally, constructed with the scenario index directly (no set_index copy)
         self.solution = pd.DataFrame(data={
-            "timestamp": scenario.index,
             "charge_rate": self.charge_rate,
             "soc": self.optimal_profile,
             "solar_curtailment": self.solar_curtailment,
-        }).set_index("timestamp")
+        }, index=scenario.index, copy=False)
 
         return self.solution
@@ -11,6 +11,8 @@ class ImportTariffOptimisationController(AbstractBatteryController):
     charge battery at maximum possible rate when the import tariff is lower than average.
     """
 
+    __slots__ = ("import_tariff_average",)
+
     def __init__(self, params: dict = {}, debug: bool = False) -> None:
         super().__init__(name=self.__class__.__name__, debug=debug)
 
@@ -20,12 +22,12 @@ class ImportTariffOptimisationController(AbstractBatteryController):
         # Update all params with those that were passed in
         self.update_params(params)
 
-    def solve_one_interval(self, scenario_interval: pd.DataFrame) -> float:
+    def solve_one_interval(self, scenario_interval: tuple) -> float:
         """ See parent AbstractBatteryController class for parameter descriptions """
 
         # if import tariff is higher than average, discharge to meet demand
-        if scenario_interval["tariff_import"] >= self.import_tariff_average:
-            return -1 * scenario_interval["demand"]
+        if scenario_interval.tariff_import >= self.import_tariff_average:
+            return -1 * scenario_interval.demand
         # otherwise charge
         return self.battery.model.max_charge_rate
 
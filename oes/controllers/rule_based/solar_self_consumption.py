@@ -11,15 +11,17 @@ class SolarSelfConsumptionController(AbstractBatteryController):
     when there is more demand, discharge to meet this.
     """
 
+    __slots__ = ()
+
     def __init__(self, params: dict = {}, debug: bool = False) -> None:
         super().__init__(name=self.__class__.__name__, debug=debug)
 
         # Update all params with those that were passed in
         self.update_params(params)
 
-    def solve_one_interval(self, scenario_interval: pd.DataFrame) -> float:
+    def solve_one_interval(self, scenario_interval: tuple) -> float:
         """ See parent AbstractBatteryController class for parameter descriptions """
-        return scenario_interval["generation"] - scenario_interval["demand"]
+        return scenario_interval.generation - scenario_interval.demand
 
     def solve(self, scenario: pd.DataFrame, battery: Optional[AbstractBattery] = None) -> pd.DataFrame:
         """ See parent AbstractBatteryController class for parameter descriptions """
@@ -14,6 +14,8 @@ class SpotPriceArbitrageNaiveController(AbstractBatteryController):
     have a look at SpotPriceArbitrageOptimalController in optimisation_based/spotprice_arbitrage_optimal.py.)
     """
 
+    __slots__ = ("arbitrage_mean",)
+
     def __init__(self, params: dict = {}, debug: bool = False) -> None:
         super().__init__(name=self.__class__.__name__, debug=debug)
 
@@ -23,12 +25,12 @@ class SpotPriceArbitrageNaiveController(AbstractBatteryController):
         # Update all params with those that were passed in
         self.update_params(params)
 
-    def solve_one_interval(self, scenario_interval: pd.DataFrame) -> float:
+    def solve_one_interval(self, scenario_interval: tuple) -> float:
         """ See parent AbstractBatteryController class for parameter descriptions """
 
-        if scenario_interval["tariff_import"] < self.arbitrage_mean:
+        if scenario_interval.tariff_import < self.arbitrage_mean:
             return self.battery.model.max_charge_rate
-        elif scenario_interval["tariff_export"] > self.arbitrage_mean:
+        elif scenario_interval.tariff_export > self.arbitrage_mean:
             return -1 * self.battery.model.max_discharge_rate
 
         return 0
@@ -1,9 +1,13 @@
+from functools import lru_cache
 from typing import Union
 import pandas as pd
 
 
+@lru_cache(maxsize=128)
 def timedelta_to_hours(time_delta: pd.Timedelta) -> float:
     """ Convert a time delta to a float representing hours """
+    # Cached: resolution detection runs at the top of every solve call, and in repeated
+    # (e.g. MPC-style) solves the same handful of timedeltas comes back every time
     return time_delta.total_seconds() / 3600
 
 
@@ -140,11 +140,12 @@ def convert_schedule_to_solution(scenario: pd.DataFrame, schedule: pd.Series,
             curr_controller_txt = schedule.loc[index, column_name]
             curr_controller = controllers[curr_controller_txt]
 
+    # Construct with the scenario index directly -- avoids the set_index round-trip, which
+    # copies the column buffers
     return pd.DataFrame(data={
-        'timestamp': scenario_copy.index,
         'charge_rate': all_charge_rates,
         'soc': all_soc
-    }).set_index('timestamp')
+    }, index=scenario_copy.index)
 
 
 def calculate_solution_performance(scenario: pd.DataFrame, solution: pd.DataFrame = None,
@@ -252,17 +253,18 @@ def calculate_solution_performance(scenario: pd.DataFrame, solution: pd.DataFram
     soc_actual = soc_actual[:-1]
     accumulated_cost = accumulated_cost[1:]
 
+    # Construct with the scenario index directly (no set_index round-trip); pass the solution
+    # columns as raw arrays so no index alignment pass is needed either
     return pd.DataFrame(data={
-        'timestamp': scenario_copy.index,
-        'charge_rate_predicted': solution['charge_rate'],
+        'charge_rate_predicted': solution['charge_rate'].to_numpy(),
         'charge_rate_actual': charge_rate_actual,
-        'soc_predicted': solution['soc'],
+        'soc_predicted': solution['soc'].to_numpy(),
         'soc_actual': soc_actual,
-        'solar_curtailment': solution['solar_curtailment'],
+        'solar_curtailment': solution['solar_curtailment'].to_numpy(),
         'grid_impact': grid_impact,
         'interval_cost': interval_cost,
         'accumulated_cost': accumulated_cost,
-    }).set_index('timestamp')
+    }, index=scenario_copy.index)
 
 
 def compare_solutions(solutions: Dict[str, pd.DataFrame]) -> pd.DataFrame:
@@ -282,6 +284,5 @@ def compare_solutions(solutions: Dict[str, pd.DataFrame]) -> pd.DataFrame:
         if timestamps is None:
             timestamps = solutions[solution].index
 
-    accumulated_cost['timestamp'] = timestamps
-
-    return pd.DataFrame(data=accumulated_cost).set_index('timestamp')
+    # Construct with the shared index directly -- avoids the set_index round-trip
+    return pd.DataFrame(data=accumulated_cost, index=timestamps)
@@ -0,0 +1,27 @@
+"""
+Optional numba support.
+
+Numba is not a required dependency of this package.  When it is installed, functions decorated
+with the njit below are compiled to machine code; when it is not, the decorator is a no-op and
+the plain Python implementations are used instead.
+"""
+
+try:
+    from numba import njit, prange  # noqa: F401
+    numba_available = True
+
+except ImportError:
+    numba_available = False
+
+    def njit(*args, **kwargs):
+        """ No-op stand-in for numba.njit when numba is not installed """
+        # Support both bare @njit and parameterised @njit(cache=True) usage
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
+
+    prange = range